@@ -2,23 +2,100 @@ import os
 import asyncio
 from datetime import datetime
 from zoneinfo import ZoneInfo
+import time
 import logging
+import logging.handlers
+import queue
 import sys
-import xml.etree.ElementTree as ET
 import re
-import json
+import functools
+from xml.sax.saxutils import unescape as xml_unescape
 import aiohttp
-
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('server.log')
-    ]
+import orjson
+from lxml import etree as ET
+
+# Configure logging: records are queued on the event loop thread and
+# written to stdout/file by a background listener thread
+_log_queue = queue.SimpleQueue()
+_log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+_log_handlers = [
+    logging.StreamHandler(sys.stdout),
+    logging.handlers.RotatingFileHandler('server.log', maxBytes=10_000_000, backupCount=3, delay=True)
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers)
+logging.getLogger().setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+logging.getLogger().addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_listener.start()
+
+_XML_DOC_RE = re.compile(rb'(<\?xml.*?</config>)', re.DOTALL)
+# Heartbeat fast path: a UTF-8 document whose <config> holds only plain
+# leaf elements (no attributes, CDATA, comments, self-closing tags, CRs or
+# entities beyond the predefined five) around a leaf-only <DeviceInfo>.
+# Tag pairs are matched by backreference. Anything else goes through the
+# parser.
+_XML_WS = rb'[ \t\r\n]*'
+_XML_NAME = rb'[A-Za-z_][\w.\-]*'
+_XML_CHARS = rb'[^<&\x00-\x08\x0b-\x1f]*'
+_XML_TEXT = _XML_CHARS + rb'(?:&(?:amp|lt|gt|quot|apos);' + _XML_CHARS + rb')*'
+
+def _xml_leaves(group):
+    return (rb'(?:' + _XML_WS + rb'<(?P<' + group + rb'>' + _XML_NAME + rb')>' + _XML_TEXT +
+            rb'</(?P=' + group + rb')>)*')
+
+_XML_LEAF_RE = re.compile(rb'<(' + _XML_NAME + rb')>(' + _XML_TEXT + rb')</\1>')
+_HEARTBEAT_DOC_RE = re.compile(
+    rb'<\?xml[ \t\r\n]+version=(?P<vq>["\'])1\.[0-9](?P=vq)'
+    rb'(?:[ \t\r\n]+encoding=(?P<eq>["\'])(?i:utf-8)(?P=eq))?' + _XML_WS + rb'\?>' + _XML_WS +
+    rb'<config>' + _xml_leaves(rb'before_tag') + _XML_WS +
+    rb'<DeviceInfo>(?P<info>' + _xml_leaves(rb'info_tag') + rb')' + _XML_WS + rb'</DeviceInfo>' +
+    _xml_leaves(rb'after_tag') + _XML_WS + rb'</config>'
+)
+_XML_UNESCAPE_ENTITIES = {"&quot;": '"', "&apos;": "'"}
+_CONTENT_LENGTH_RE = re.compile(rb'\r\ncontent-length:\s*(\d+)', re.IGNORECASE)
+_MAX_REQUEST_SIZE = 1024 * 1024
+_READ_TIMEOUT = 10
+_XML_PARSER = ET.XMLParser(resolve_entities='internal', no_network=True, remove_comments=True, remove_pis=True)
+
+# Precompiled XPath probes, each returns a (possibly empty) list of matches
+_X_ALARM_STATUS_INFO = ET.XPath('.//alarmStatusInfo')
+_X_DEVICE_INFO = ET.XPath('.//DeviceInfo')
+_X_DATA_TIME = ET.XPath('.//DataTime')
+_X_SMART_TYPE = ET.XPath('.//smartType')
+_X_MAC = ET.XPath('.//mac')
+_X_SN = ET.XPath('.//sn')
+_X_DEVICE_NAME = ET.XPath('.//deviceName')
+_X_NAME = ET.XPath('.//name')
+
+_RESP_OK = b"<response>OK</response>"
+_RESP_BAD_XML = b"<error>Invalid XML</error>"
+_RESP_ISE = b"<error>Internal Server Error</error>"
+_RESP_UNKNOWN_HTTP = b"<error>Unknown HTTP POST request</error>"
+_RESP_TOO_LARGE = b"<error>Request Too Large</error>"
+
+_XML_ESCAPE_TABLE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+_RESPONSE_XML_TEMPLATE = (
+    b"<?xml version='1.0' encoding='UTF-8'?>\n"
+    b'<alarmServerResponse version="1.0"><status>success</status>'
+    b'<timestamp>%s</timestamp><receivedAlarmType>%s</receivedAlarmType>'
+    b'<deviceInfo><deviceName>%s</deviceName><deviceNo>%s</deviceNo>'
+    b'<sn>%s</sn><ipAddress>%s</ipAddress><macAddress>%s</macAddress></deviceInfo>'
+    b'<serverActions><action>alarmLogged</action><action>notificationSent</action></serverActions>'
+    b'<message>Alarm received and processed successfully</message></alarmServerResponse>'
 )
 
+def _xml_escape(value):
+    return value.translate(_XML_ESCAPE_TABLE)
+
+@functools.lru_cache(maxsize=64)
+def _upper(value):
+    return value.upper()
+
+@functools.lru_cache(maxsize=128)
+def _dump_device_info(items):
+    return orjson.dumps(dict(items), option=orjson.OPT_INDENT_2).decode('utf-8')
+
 class PagerDutyTrigger:
     def __init__(self, api_token, service_id, from_email, paging_start_time, paging_end_time):
         self.api_token = api_token
@@ -28,40 +105,85 @@ class PagerDutyTrigger:
         self.paging_start_time = self.parse_time(paging_start_time)
         self.paging_end_time = self.parse_time(paging_end_time)
         self.israel_tz = ZoneInfo("Asia/Jerusalem")
+        self._paging_start_s = self.seconds_of_day(self.paging_start_time)
+        self._paging_end_s = self.seconds_of_day(self.paging_end_time)
+        self._tz_offset = 0
+        self._tz_offset_expires = 0
+        self._static_headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/vnd.pagerduty+json;version=2",
+            "Authorization": f"Token token={self.api_token}",
+            "From": self.from_email
+        }
+        self._incident_template = {
+            "type": "incident",
+            "title": None,
+            "service": {
+                "id": self.service_id,
+                "type": "service_reference"
+            },
+            "urgency": "high",
+            "body": None
+        }
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _get_session(self):
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                headers=self._static_headers,
+                timeout=aiohttp.ClientTimeout(total=30),
+                connector=aiohttp.TCPConnector(
+                    limit=20,
+                    keepalive_timeout=75,
+                    force_close=False,
+                    use_dns_cache=True,
+                    ttl_dns_cache=300,
+                    resolver=aiohttp.AsyncResolver()
+                )
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
 
     def parse_time(self, time_str):
         return datetime.strptime(time_str, "%H:%M").time()
 
+    def seconds_of_day(self, t):
+        return t.hour * 3600 + t.minute * 60
+
     def get_current_israel_time(self):
         return datetime.now(self.israel_tz)
 
+    def get_israel_utc_offset(self, now):
+        # Israel's UTC offset only changes on an hour boundary, so it is
+        # looked up once and reused until the next full hour
+        if now >= self._tz_offset_expires:
+            self._tz_offset = self.get_current_israel_time().utcoffset().total_seconds()
+            self._tz_offset_expires = now - now % 3600 + 3600
+        return self._tz_offset
+
     def is_paging_time(self):
-        now = self.get_current_israel_time().time()
-        if self.paging_start_time <= self.paging_end_time:
-            return self.paging_start_time <= now < self.paging_end_time
+        now = time.time()
+        now_s = (now + self.get_israel_utc_offset(now)) % 86400
+        if self._paging_start_s <= self._paging_end_s:
+            return self._paging_start_s <= now_s < self._paging_end_s
         else:  # Handles cases where the range crosses midnight
-            return now >= self.paging_start_time or now < self.paging_end_time
+            return now_s >= self._paging_start_s or now_s < self._paging_end_s
 
     async def trigger_incident(self, title, details, urgency="high"):
-        if not self.is_paging_time():
-            logging.info(f"Incident not created due to time restrictions: {title}")
-            return
-
-        headers = {
-            "Content-Type": "application/json",
-            "Accept": "application/vnd.pagerduty+json;version=2",
-            "Authorization": f"Token token={self.api_token}",
-            "From": self.from_email
-        }
-        
         payload = {
             "incident": {
-                "type": "incident",
+                **self._incident_template,
                 "title": title,
-                "service": {
-                    "id": self.service_id,
-                    "type": "service_reference"
-                },
                 "urgency": urgency,
                 "body": {
                     "type": "incident_body",
@@ -70,12 +192,13 @@ class PagerDutyTrigger:
             }
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(self.url, headers=headers, json=payload) as response:
-                if response.status == 201:
-                    logging.info(f"PagerDuty incident created successfully: {title}")
-                else:
-                    logging.error(f"Failed to create PagerDuty incident: {await response.text()}")
+        session = await self._get_session()
+        async with session.post(self.url, data=orjson.dumps(payload)) as response:
+            if response.status == 201:
+                response.release()
+                logging.info("PagerDuty incident created successfully: %s", title)
+            else:
+                logging.error("Failed to create PagerDuty incident: %s", await response.text())
 
 class ProvisionISRHandler:
     def __init__(self):
@@ -86,34 +209,94 @@ class ProvisionISRHandler:
             os.getenv("PAGING_START_TIME", "00:00"),
             os.getenv("PAGING_END_TIME", "23:59")
         )
-        self.pagerduty_alert_types = os.getenv("PAGERDUTY_ALERT_TYPES", "").upper().split(",")
+        self.pagerduty_alert_types = frozenset(
+            t.strip() for t in os.getenv("PAGERDUTY_ALERT_TYPES", "").upper().split(",") if t.strip()
+        )
         self.israel_tz = ZoneInfo("Asia/Jerusalem")
+        self._pd_sem = asyncio.Semaphore(5)
 
     def get_current_israel_time(self):
         return datetime.now(self.israel_tz)
 
     async def handle_client(self, reader, writer):
         addr = writer.get_extra_info('peername')
-        logging.info(f"New connection from {addr}")
-        data = await reader.read(4096)
-        if data:
-            logging.info(f"Received data:\n{data.decode('utf-8', errors='replace')}")
+        logging.info("New connection from %s", addr)
+        data = await self.read_request(reader)
+        if data is None:
+            await self.send_response(writer, _RESP_TOO_LARGE)
+        elif data:
+            if logging.getLogger().isEnabledFor(logging.DEBUG):
+                logging.debug("Received data:\n%s", data.decode('utf-8', errors='replace'))
             await self.process_request(data, writer)
         else:
             logging.warning("No data received")
         writer.close()
         await writer.wait_closed()
 
+    async def read_request(self, reader):
+        # Everything received is kept in data, so a timeout still leaves
+        # whatever the peer sent available for processing. Returns None
+        # when the request is rejected for exceeding _MAX_REQUEST_SIZE.
+        data = bytearray()
+        try:
+            await asyncio.wait_for(self.read_into(reader, data), _READ_TIMEOUT)
+        except asyncio.TimeoutError:
+            logging.warning("Timed out after %ss reading request (%d bytes received)", _READ_TIMEOUT, len(data))
+        except ValueError as e:
+            logging.error("Rejected request: %s", e)
+            return None
+        return bytes(data)
+
+    async def read_into(self, reader, data):
+        is_post = None
+        expected_size = None
+        config_closed = False
+        while True:
+            chunk = await reader.read(4096)
+            if not chunk:
+                return
+            data += chunk
+            if len(data) > _MAX_REQUEST_SIZE:
+                raise ValueError(f"Request exceeds {_MAX_REQUEST_SIZE} bytes")
+            if is_post is None and len(data) >= 4:
+                is_post = data.startswith(b'POST')
+
+            if is_post:
+                if expected_size is None:
+                    # Only the newly read bytes (plus an overlap for a split
+                    # terminator) are scanned for the end of the headers
+                    header_end = data.find(b'\r\n\r\n', max(0, len(data) - len(chunk) - 3))
+                    if header_end != -1:
+                        match = _CONTENT_LENGTH_RE.search(data, 0, header_end)
+                        expected_size = header_end + 4 + (int(match.group(1)) if match else 0)
+                        if expected_size > _MAX_REQUEST_SIZE:
+                            raise ValueError(f"HTTP request of {expected_size} bytes exceeds {_MAX_REQUEST_SIZE} bytes")
+                if expected_size is not None and len(data) >= expected_size:
+                    return
+            elif is_post is False:
+                stripped = chunk.rstrip()
+                if stripped:
+                    config_closed = data.endswith(b'</config>', 0, len(data) - len(chunk) + len(stripped))
+                if config_closed:
+                    return
+
+
     async def process_request(self, data, writer):
         try:
             if data.startswith(b'POST'):
                 await self.handle_http_post(data, writer)
             else:
-                xml_documents = self.split_xml_documents(data.decode('utf-8'))
-                for xml_doc in xml_documents:
-                    xml_root = ET.fromstring(xml_doc)
+                for xml_doc in self.split_xml_documents(data):
+                    device_info = self.extract_heartbeat_device_info(xml_doc)
+                    if device_info is not None:
+                        # Plain heartbeats skip the XML parser entirely
+                        logging.info("Identified request type: heartbeat")
+                        await self.handle_heartbeat_bytes(device_info)
+                        continue
+
+                    xml_root = ET.fromstring(xml_doc, _XML_PARSER)
                     request_type = self.identify_request_type(xml_root)
-                    logging.info(f"Identified request type: {request_type}")
+                    logging.info("Identified request type: %s", request_type)
                     
                     if request_type == "heartbeat":
                         await self.handle_heartbeat(xml_root)
@@ -122,33 +305,36 @@ class ProvisionISRHandler:
                     else:
                         logging.warning("Unknown request type")
                 
-                await self.send_response(writer, b"<response>OK</response>")
+                await self.send_response(writer, _RESP_OK)
         except ET.ParseError as e:
-            logging.error(f"XML Parse Error: {str(e)}")
-            await self.send_response(writer, b"<error>Invalid XML</error>")
+            logging.error("XML Parse Error: %s", e)
+            await self.send_response(writer, _RESP_BAD_XML)
         except Exception as e:
-            logging.error(f"Unexpected error in process_request: {str(e)}", exc_info=True)
-            await self.send_response(writer, b"<error>Internal Server Error</error>")
+            logging.error("Unexpected error in process_request: %s", e, exc_info=True)
+            await self.send_response(writer, _RESP_ISE)
 
     def split_xml_documents(self, data):
-        pattern = r'(<\?xml.*?<\/config>)'
-        return re.findall(pattern, data, re.DOTALL)
+        return _XML_DOC_RE.findall(data)
 
     def identify_request_type(self, xml_root):
-        if xml_root.find(".//alarmStatusInfo") is not None:
+        if _X_ALARM_STATUS_INFO(xml_root):
             return "alarm"
-        elif xml_root.find(".//DataTime") is not None and xml_root.find(".//DeviceInfo") is not None:
+        elif _X_DATA_TIME(xml_root) and _X_DEVICE_INFO(xml_root):
             return "heartbeat"
         return "unknown"
 
     async def handle_heartbeat(self, xml_root):
         logging.info("Handling heartbeat request")
         device_info = self.extract_device_info(xml_root)
-        logging.info(f"Heartbeat from device: {device_info}")
+        logging.info("Heartbeat from device: %s", device_info)
+
+    async def handle_heartbeat_bytes(self, device_info):
+        logging.info("Handling heartbeat request")
+        logging.info("Heartbeat from device: %s", device_info)
 
     async def handle_alarm(self, xml_root):
         logging.info("Handling alarm request")
-        alarm_info = xml_root.find(".//alarmStatusInfo")
+        alarm_info = _X_ALARM_STATUS_INFO(xml_root)[0]
         device_info = self.extract_device_info(xml_root)
         
         alarm_tasks = []
@@ -158,12 +344,15 @@ class ProvisionISRHandler:
             alarm_name = alarm.get('name')
             alarm_status = alarm.text.lower()
             
-            logging.info(f"Alarm received: Type={alarm_type}, ID={alarm_id}, Name={alarm_name}, Status={alarm_status}")
+            logging.info("Alarm received: Type=%s, ID=%s, Name=%s, Status=%s", alarm_type, alarm_id, alarm_name, alarm_status)
             
             if alarm_status == "true":
                 alarm_tasks.append(self.process_alarm(alarm_type, alarm_id, alarm_name, device_info))
         
-        await asyncio.gather(*alarm_tasks)
+        results = await asyncio.gather(*alarm_tasks, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logging.error("Failed to process alarm: %s", result, exc_info=result)
 
     async def handle_http_post(self, data, writer):
         logging.info("Handling HTTP POST request")
@@ -175,108 +364,138 @@ class ProvisionISRHandler:
             await self.handle_http_alarm(body)
         else:
             logging.warning("Unknown HTTP POST request")
-            await self.send_response(writer, b"<error>Unknown HTTP POST request</error>")
+            await self.send_response(writer, _RESP_UNKNOWN_HTTP)
 
     def parse_http_post(self, data):
-        request = data.decode('utf-8')
-        headers, body = request.split('\r\n\r\n', 1)
-        headers = dict(line.split(': ', 1) for line in headers.splitlines()[1:] if ': ' in line)
-        headers['path'] = request.splitlines()[0].split()[1]
+        sep = data.find(b'\r\n\r\n')
+        if sep == -1:
+            head, body = data, b''
+        else:
+            head, body = data[:sep], data[sep + 4:]
+        first_nl = head.find(b'\r\n')
+        request_line = head if first_nl == -1 else head[:first_nl]
+        headers = {'path': request_line.split(b' ', 2)[1].decode('ascii')}
+        if first_nl != -1:
+            for line in head[first_nl + 2:].split(b'\r\n'):
+                key, _, value = line.partition(b': ')
+                if value:
+                    headers[key.decode('latin-1')] = value.decode('latin-1')
         return headers, body
 
     async def handle_http_heartbeat(self, headers):
         logging.info("Handling HTTP heartbeat")
         device_info = f"IP: {headers.get('Host', 'Unknown')}"
-        logging.info(f"HTTP Heartbeat from device: {device_info}")
+        logging.info("HTTP Heartbeat from device: %s", device_info)
 
     async def handle_http_alarm(self, body):
         logging.info("Handling HTTP alarm")
         try:
-            xml_root = ET.fromstring(body)
-            smart_type = xml_root.find(".//smartType").text
+            xml_root = ET.fromstring(body, _XML_PARSER)
+            smart_type = _X_SMART_TYPE(xml_root)[0].text
             device_info = self.extract_http_device_info(xml_root)
             
-            logging.info(f"HTTP Alarm received: Type={smart_type}")
-            logging.info(f"Device info: {device_info}")
+            logging.info("HTTP Alarm received: Type=%s", smart_type)
+            logging.info("Device info: %s", device_info)
             
-            await self.process_http_alarm(smart_type, xml_root, device_info)
+            await self.process_http_alarm(smart_type, xml_root, device_info, body)
         except ET.ParseError as e:
-            logging.error(f"XML Parse Error in HTTP alarm: {str(e)}")
+            logging.error("XML Parse Error in HTTP alarm: %s", e)
 
     def extract_device_info(self, xml_root):
-        device_info = xml_root.find(".//DeviceInfo")
-        if device_info is not None:
-            return {child.tag: child.text for child in device_info}
+        device_info = _X_DEVICE_INFO(xml_root)
+        if device_info:
+            return {child.tag: child.text for child in device_info[0]}
         return {}
 
+    def extract_heartbeat_device_info(self, xml_doc):
+        # Returns the DeviceInfo fields of a plain heartbeat document, or
+        # None when the document is anything else and must go through the
+        # full XML parse
+        if (b'<alarmStatusInfo' in xml_doc or b'<DataTime>' not in xml_doc
+                or b']]>' in xml_doc):
+            return None
+        match = _HEARTBEAT_DOC_RE.fullmatch(xml_doc)
+        if match is None:
+            return None
+        try:
+            xml_doc.decode('utf-8')
+        except UnicodeDecodeError:
+            return None
+        return {
+            tag.decode('ascii'): (
+                xml_unescape(text.decode('utf-8'), _XML_UNESCAPE_ENTITIES) if b'&' in text
+                else text.decode('utf-8')
+            ) or None
+            for tag, text in _XML_LEAF_RE.findall(match.group('info'))
+        }
+
     def extract_http_device_info(self, xml_root):
         return {
-            "mac": xml_root.find(".//mac").text,
-            "sn": xml_root.find(".//sn").text,
-            "deviceName": xml_root.find(".//deviceName").text
+            "mac": _X_MAC(xml_root)[0].text,
+            "sn": _X_SN(xml_root)[0].text,
+            "deviceName": _X_DEVICE_NAME(xml_root)[0].text
         }
 
     async def process_alarm(self, alarm_type, alarm_id, alarm_name, device_info):
-        current_time = self.get_current_israel_time()
-        logging.info(f"Processing alarm at {current_time.isoformat()}: Type={alarm_type}, ID={alarm_id}, Name={alarm_name}")
-        logging.info(f"Device Info: {device_info}")
+        logging.info("Processing alarm: Type=%s, ID=%s, Name=%s", alarm_type, alarm_id, alarm_name)
+        logging.info("Device Info: %s", device_info)
         
-        if alarm_type.upper() in self.pagerduty_alert_types:
+        if _upper(alarm_type) in self.pagerduty_alert_types:
+            if not self.pagerduty_trigger.is_paging_time():
+                logging.info("Incident not created due to time restrictions: %s - %s", alarm_type, alarm_name)
+                return
+            current_time = self.get_current_israel_time()
             title = f"Provision ISR Alarm: {alarm_type} - {alarm_name}"
-            details = f"Alarm ID: {alarm_id}\nAlarm Name: {alarm_name}\nDevice Info: {json.dumps(device_info, indent=2)}\nAlarm Time: {current_time.isoformat()}"
-            await self.pagerduty_trigger.trigger_incident(title, details)
+            details = f"Alarm ID: {alarm_id}\nAlarm Name: {alarm_name}\nDevice Info: {_dump_device_info(tuple(device_info.items()))}\nAlarm Time: {current_time.isoformat()}"
+            async with self._pd_sem:
+                await self.pagerduty_trigger.trigger_incident(title, details)
         else:
-            logging.info(f"Alarm type {alarm_type} not in alert list. No PagerDuty incident created.")
-
-    async def process_http_alarm(self, smart_type, xml_root, device_info):
-        current_time = self.get_current_israel_time()
-        logging.info(f"Processing HTTP alarm at {current_time.isoformat()}: Type={smart_type}")
-        logging.info(f"Device Info: {device_info}")
-
-        if smart_type.upper() in self.pagerduty_alert_types:
-            alarm_name = xml_root.find(".//name").text if xml_root.find(".//name") is not None else "Unknown"
+            logging.info("Alarm type %s not in alert list. No PagerDuty incident created.", alarm_type)
+
+    async def process_http_alarm(self, smart_type, xml_root, device_info, body):
+        logging.info("Processing HTTP alarm: Type=%s", smart_type)
+        logging.info("Device Info: %s", device_info)
+
+        if _upper(smart_type) in self.pagerduty_alert_types:
+            if not self.pagerduty_trigger.is_paging_time():
+                logging.info("Incident not created due to time restrictions: %s", smart_type)
+                return
+            current_time = self.get_current_israel_time()
+            names = _X_NAME(xml_root)
+            alarm_name = names[0].text if names else "Unknown"
             title = f"Provision ISR HTTP Alarm: {smart_type} - {alarm_name}"
-            details = f"Device Info: {json.dumps(device_info, indent=2)}\nXML Data: {ET.tostring(xml_root, encoding='unicode')}\nAlarm Time: {current_time.isoformat()}"
-            await self.pagerduty_trigger.trigger_incident(title, details)
+            details = f"Device Info: {_dump_device_info(tuple(device_info.items()))}\nXML Data: {body.decode('utf-8', errors='replace')}\nAlarm Time: {current_time.isoformat()}"
+            async with self._pd_sem:
+                await self.pagerduty_trigger.trigger_incident(title, details)
         else:
-            logging.info(f"HTTP Alarm type {smart_type} not in alert list. No PagerDuty incident created.")
+            logging.info("HTTP Alarm type %s not in alert list. No PagerDuty incident created.", smart_type)
 
     def generate_response_xml(self, alarm_type, device_info):
-        root = ET.Element("alarmServerResponse")
-        root.set("version", "1.0")
-
-        ET.SubElement(root, "status").text = "success"
-        ET.SubElement(root, "timestamp").text = self.get_current_israel_time().isoformat(timespec='seconds')
-        ET.SubElement(root, "receivedAlarmType").text = alarm_type.upper()
-
-        device_info_elem = ET.SubElement(root, "deviceInfo")
-        ET.SubElement(device_info_elem, "deviceName").text = device_info.get("DeviceName", "")
-        ET.SubElement(device_info_elem, "deviceNo").text = device_info.get("DeviceNo.", "")
-        ET.SubElement(device_info_elem, "sn").text = device_info.get("SN", "")
-        ET.SubElement(device_info_elem, "ipAddress").text = device_info.get("ipAddress", "")
-        ET.SubElement(device_info_elem, "macAddress").text = device_info.get("macAddress", "")
-
-        server_actions = ET.SubElement(root, "serverActions")
-        ET.SubElement(server_actions, "action").text = "alarmLogged"
-        ET.SubElement(server_actions, "action").text = "notificationSent"
-
-        ET.SubElement(root, "message").text = "Alarm received and processed successfully"
-
-        return ET.tostring(root, encoding='UTF-8', xml_declaration=True)
+        values = (
+            self.get_current_israel_time().isoformat(timespec='seconds'),
+            alarm_type.upper(),
+            device_info.get("DeviceName", ""),
+            device_info.get("DeviceNo.", ""),
+            device_info.get("SN", ""),
+            device_info.get("ipAddress", ""),
+            device_info.get("macAddress", "")
+        )
+        return _RESPONSE_XML_TEMPLATE % tuple(_xml_escape(v or "").encode('utf-8') for v in values)
 
     async def send_response(self, writer, content):
         writer.write(content)
         await writer.drain()
-        logging.info(f"Sent response:\n{content.decode('utf-8', errors='replace')}")
+        if logging.getLogger().isEnabledFor(logging.INFO):
+            logging.info("Sent response:\n%s", content.decode('utf-8', errors='replace'))
 
 async def main(host, port):
     handler = ProvisionISRHandler()
     server = await asyncio.start_server(handler.handle_client, host, port)
 
     addr = server.sockets[0].getsockname()
-    logging.info(f'Serving on {addr}')
+    logging.info('Serving on %s', addr)
 
-    async with server:
+    async with server, handler.pagerduty_trigger:
         await server.serve_forever()
 
 if __name__ == "__main__":
@@ -287,6 +506,9 @@ if __name__ == "__main__":
     
     israel_tz = ZoneInfo("Asia/Jerusalem")
     israel_time = datetime.now(israel_tz).strftime("%Y-%m-%d %H:%M:%S %Z")
-    logging.info(f"Starting Asynchronous Provision-ISR Alarm Server on {host}:{port}")
-    logging.info(f"Current Israel time: {israel_time}")
-    asyncio.run(main(host, port))
+    logging.info("Starting Asynchronous Provision-ISR Alarm Server on %s:%s", host, port)
+    logging.info("Current Israel time: %s", israel_time)
+    try:
+        asyncio.run(main(host, port))
+    finally:
+        _log_listener.stop()